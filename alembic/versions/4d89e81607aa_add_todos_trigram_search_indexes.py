@@ -0,0 +1,52 @@
+"""add todos trigram search indexes
+
+Revision ID: 4d89e81607aa
+Revises: 58b3d495f445
+Create Date: 2026-10-15 11:02:17.904512
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4d89e81607aa"
+down_revision: Union[str, Sequence[str], None] = "58b3d495f445"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_COLUMNS = ["title", "description"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm is Postgres only. SQLite keeps scanning for searches.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for column in TRGM_COLUMNS:
+            op.create_index(
+                f"ix_todos_{column}_trgm",
+                "todos",
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        for column in TRGM_COLUMNS:
+            op.drop_index(
+                f"ix_todos_{column}_trgm",
+                table_name="todos",
+                postgresql_concurrently=True,
+            )
@@ -0,0 +1,49 @@
+"""add todos owner indexes
+
+Revision ID: 58b3d495f445
+Revises: 64bb13831898
+Create Date: 2026-10-15 10:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "58b3d495f445"
+down_revision: Union[str, Sequence[str], None] = "64bb13831898"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY avoids locking writes on Postgres while the index builds,
+    # but it can't run inside a transaction. Other dialects ignore the flag.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_todos_owner_id_id",
+            "todos",
+            ["owner_id", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_todos_owner_complete_priority",
+            "todos",
+            ["owner_id", "complete", "priority"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_todos_owner_complete_priority",
+            table_name="todos",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_todos_owner_id_id", table_name="todos", postgresql_concurrently=True
+        )
@@ -10,7 +10,16 @@ celery = Celery(
     backend=settings.CELERY_RESULT_BACKEND,
 )
 
+# Results are only stored for tasks that opt in, and expire after an hour so
+# Redis memory stays bounded.
+celery.conf.update(
+    task_ignore_result=True,
+    result_expires=3600,
+    result_extended=False,
+    broker_transport_options={"visibility_timeout": 3600},
+)
+
 
-@celery.task(name="add")
+@celery.task(name="add", ignore_result=False)
 def add(x: int, y: int) -> int:
     return x + y
@@ -1,14 +1,11 @@
 from functools import lru_cache
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    pass
-
-
-class LocalSettings(Settings):
-    # Get override by env file when they are added
+    # One settings class for every environment. Defaults suit local development;
+    # other environments override them through env vars or their env file.
     FASTAPI_CONFIG: str = "local"
     DATABASE_URL: str = ""
     POSTGRES_USER: str = "todo_user"
@@ -16,19 +13,28 @@ class LocalSettings(Settings):
     POSTGRES_HOST: str = "db"
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = "todo_db"
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 3600
     CELERY_BROKER_URL: str = "redis://redis:6379/0"
-    CELERY_RESULT_BACKEND: str = "redis://redis:6379/0"
+    # Results live in their own Redis DB so they never crowd the broker queue
+    CELERY_RESULT_BACKEND: str = "redis://redis:6379/1"
     SECRET_KEY: str = ""
+    BCRYPT_ROUNDS: int = 12
     BASE_URL: str = "http://localhost:8080"
     CLIENT_URL: str = "http://localhost:3000"
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = f"{BASE_URL}/auth/google/callback"
 
-    class Config:
-        env_file = ".env/.env.local"
+    # Frozen since settings are read-only after startup and shared by all modules.
+    # Unknown keys are ignored so env files can carry values for other services.
+    model_config = SettingsConfigDict(
+        env_file=".env/.env.local", extra="ignore", frozen=True
+    )
 
 
 @lru_cache(maxsize=1)
-def get_settings() -> LocalSettings:
-    return LocalSettings()
+def get_settings() -> Settings:
+    return Settings()
@@ -1,8 +1,9 @@
-from typing import Any, Generator
+from typing import Any, AsyncGenerator
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
 
 from app.config import get_settings
 
@@ -11,26 +12,71 @@ settings = get_settings()
 # SQLACHEMY_DATABASE_URL = "sqlite:///./todosapp.db"
 DATABASE_URL = settings.DATABASE_URL or "sqlite:///./todosapp.db"
 
-# Creates a connection to the SQLite database with multithreading support.
-engine = create_engine(DATABASE_URL)
+# DATABASE_URL stays a sync URL (psycopg2) because Alembic and the entrypoint
+# script use it directly. The app swaps in the matching asyncio driver.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_url(url: str) -> str:
+    sync_url = make_url(url)
+    drivername = ASYNC_DRIVERS.get(sync_url.drivername, sync_url.drivername)
+    return sync_url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def get_engine_options(url: str) -> dict[str, Any]:
+    # Pre-ping and recycle drop connections Postgres closed while idle.
+    options: dict[str, Any] = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+    if url.startswith("sqlite"):
+        # SQLite connections may be used from threads other than the creator.
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+# Creates an async connection pool so queries don't block the event loop.
+engine = create_async_engine(
+    get_async_url(DATABASE_URL), **get_engine_options(DATABASE_URL)
+)
+
+if DATABASE_URL.startswith("sqlite"):
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        """WAL lets readers run alongside a writer instead of blocking on it."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
+
 
 # Creates a new database session to interact with the database.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps loaded attributes usable after commit, since
+# lazy refreshes are not allowed with AsyncSession.
+SessionLocal = async_sessionmaker(
+    engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 
-# Creates a base class for ORM models to inherit from
-Base = declarative_base()
+# Base class for ORM models to inherit from (SQLAlchemy 2.0 style)
+class Base(DeclarativeBase):
+    pass
 
 
-def get_db() -> Generator[Session, Any, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, Any]:
     """Dependency to get the database session.
 
-    Order of operations:
-    1. gen = get_db()
-    2. db = next(gen)
-    3. gen.close()
+    The session is closed when the request finishes.
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
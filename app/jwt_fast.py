@@ -0,0 +1,48 @@
+import base64
+import hmac
+import time
+from typing import Any
+
+import orjson
+from jwt import DecodeError, ExpiredSignatureError, InvalidSignatureError
+
+from app.security import SECRET_KEY_BYTES
+
+
+def _b64decode(segment: bytes) -> bytes:
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+
+def verify_hs256(token: str) -> dict[str, Any]:
+    """Verify an HS256 token issued by this app and return its payload.
+
+    Only handles what create_access_token/create_refresh_token produce, which
+    skips PyJWT's algorithm lookup and generic claim handling. Raises the same
+    jwt.InvalidTokenError subclasses as jwt.decode. The exp claim is required.
+    """
+    try:
+        signing_input, signature_segment = token.encode().rsplit(b".", 1)
+        header_segment, payload_segment = signing_input.split(b".")
+        header = orjson.loads(_b64decode(header_segment))
+        signature = _b64decode(signature_segment)
+    except ValueError as e:
+        raise DecodeError("Invalid token encoding") from e
+    if not isinstance(header, dict) or header.get("alg") != "HS256":
+        raise DecodeError("Unsupported token algorithm")
+
+    expected = hmac.new(SECRET_KEY_BYTES, signing_input, "sha256").digest()
+    if not hmac.compare_digest(expected, signature):
+        raise InvalidSignatureError("Signature verification failed")
+
+    try:
+        payload = orjson.loads(_b64decode(payload_segment))
+    except ValueError as e:
+        raise DecodeError("Invalid payload encoding") from e
+    if not isinstance(payload, dict):
+        raise DecodeError("Invalid payload")
+    exp = payload.get("exp")
+    if not isinstance(exp, (int, float)) or isinstance(exp, bool):
+        raise DecodeError("Token has no valid exp claim")
+    if time.time() > exp:
+        raise ExpiredSignatureError("Signature has expired")
+    return payload
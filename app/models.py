@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import List
 
-from sqlalchemy import Boolean, Column, ForeignKey, String, Table
+from sqlalchemy import Boolean, Column, ForeignKey, Index, String, Table
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -14,6 +14,8 @@ class Users(Base):
     # Using SQLAlchemy 2.0 style with Mapped and mapped_column
     # the strengths here include better type checking and IDE support
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # The unique constraints are backed by indexes, so the login lookup by
+    # username and the Google upsert on email don't scan the table.
     email: Mapped[str] = mapped_column(String(255), unique=True)
     username: Mapped[str] = mapped_column(String(50), unique=True)
     first_name: Mapped[str] = mapped_column(String(100))
@@ -47,6 +49,26 @@ todo_tags = Table(
 
 class Todos(Base):
     __tablename__ = "todos"
+    # Every todo route filters by owner. (owner_id, id) serves id lookups and the
+    # id-ordered list; the second index serves the complete/priority filters,
+    # and its (owner_id, complete) prefix the GraphQL todos filter.
+    # The trigram indexes back the ILIKE search and are Postgres only.
+    __table_args__ = (
+        Index("ix_todos_owner_id_id", "owner_id", "id"),
+        Index("ix_todos_owner_complete_priority", "owner_id", "complete", "priority"),
+        Index(
+            "ix_todos_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_todos_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
 
     # Using SQLAlchemy 2.0 style with Mapped and mapped_column
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -59,8 +81,11 @@ class Todos(Base):
     # Does not relate to a column in the db. Provides convenient access to the related user object.
     owner: Mapped["Users"] = relationship("Users", back_populates="todos")
 
-    # lets you access all tags for a todo
-    tags: Mapped[List[Tags]] = relationship(secondary=todo_tags, back_populates="todos")
+    # lets you access all tags for a todo. Loaded for every queried batch of todos
+    # with one SELECT ... WHERE todo_id IN (...) instead of one query per todo.
+    tags: Mapped[List[Tags]] = relationship(
+        secondary=todo_tags, back_populates="todos", lazy="selectin"
+    )
 
     # Using old style for reference
     # id = Column(Integer, primary_key=True, index=True)
@@ -1,7 +1,8 @@
 from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, HTTPException, Path, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models import Todos
@@ -12,17 +13,25 @@ from .todos import TodoResponse
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
 
 
 @router.get("/todo", status_code=status.HTTP_200_OK, response_model=list[TodoResponse])
-async def read_all_todos(user: user_dependency, db: db_dependency) -> List[Todos]:
+async def read_all_todos(
+    user: user_dependency,
+    db: db_dependency,
+    limit: int = Query(50, ge=1, le=500, description="Limit number of results"),
+    offset: int = Query(0, ge=0, description="Offset for results"),
+) -> List[Todos]:
     if user is None or user.get("user_role") != "admin":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication Failed"
         )
-    return db.query(Todos).all()
+    result = await db.execute(
+        select(Todos).order_by(Todos.id).limit(limit).offset(offset)
+    )
+    return list(result.scalars().all())
 
 
 @router.delete("/todo/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -33,10 +42,11 @@ async def delete_todo(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication Failed"
         )
-    todo_model = db.query(Todos).filter(Todos.id == todo_id).first()
-    if todo_model is None:
+    result = await db.execute(
+        delete(Todos).where(Todos.id == todo_id).returning(Todos.id)
+    )
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
         )
-    db.query(Todos).filter(Todos.id == todo_id).delete()
-    db.commit()
+    await db.commit()
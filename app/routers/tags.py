@@ -2,7 +2,8 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models import Tags
@@ -10,7 +11,7 @@ from app.models import Tags
 router = APIRouter(prefix="/tags", tags=["tags"])
 
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 
 
 class TagsRequest(BaseModel):
@@ -32,8 +33,7 @@ class TodosWithTagsResponse(BaseModel):
     complete: bool
     tags: list[TagsResponse]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 @router.post("/", status_code=201, response_model=TagsResponse)
@@ -43,11 +43,12 @@ async def create_tag(
 ) -> Tags:
     tag_model = Tags(name=tag.name)
     db.add(tag_model)
-    db.commit()
-    db.refresh(tag_model)
+    await db.commit()
+    await db.refresh(tag_model)
     return tag_model
 
 
 @router.get("/", status_code=200, response_model=list[TagsResponse])
 async def read_all_tags(db: db_dependency) -> list[Tags]:
-    return db.query(Tags).all()
+    result = await db.execute(select(Tags))
+    return list(result.scalars().all())
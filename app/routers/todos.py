@@ -1,20 +1,28 @@
-from typing import Annotated, Dict, List
+from typing import Annotated, Any, AsyncIterator, Dict, List, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
-from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models import Tags, Todos
+from app.database import SessionLocal, get_db
+from app.models import Tags, Todos, todo_tags
 from app.routers.tags import TagsResponse
 from app.utils.auth_utils import get_current_user
 
 router = APIRouter()
 
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
 
+# Rows per INSERT statement and transaction in the bulk create endpoint
+BULK_INSERT_BATCH_SIZE = 1000
+# Untagged payloads at least this large are loaded with COPY on asyncpg
+BULK_COPY_THRESHOLD = 1000
+BULK_COPY_COLUMNS = ["title", "description", "priority", "complete", "owner_id"]
+
 
 class TodoRequest(BaseModel):
     title: str = Field(min_length=3, max_length=100)
@@ -47,22 +55,65 @@ class TodoResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Built once so list endpoints reuse the compiled validator and serializer
+todo_list_adapter: TypeAdapter[List[TodoResponse]] = TypeAdapter(List[TodoResponse])
+
+
+def todo_list_response(todos: Sequence[Todos]) -> Response:
+    """Validates ORM rows and encodes them to JSON bytes in one pydantic-core pass.
+
+    This skips the intermediate Python objects FastAPI builds when it serializes a
+    response_model. The routes keep response_model for the OpenAPI schema.
+    """
+    validated = todo_list_adapter.validate_python(todos, from_attributes=True)
+    return Response(
+        todo_list_adapter.dump_json(validated), media_type="application/json"
+    )
+
+
+async def stream_todos(owner_id: int) -> AsyncIterator[str]:
+    """Yields a user's todos as NDJSON lines, fetching 100 rows at a time.
+
+    The request's session is closed before a streaming body is sent, so the
+    export opens its own session for the lifetime of the stream.
+    """
+    async with SessionLocal() as db:
+        result = await db.stream(
+            select(Todos)
+            .where(Todos.owner_id == owner_id)
+            .order_by(Todos.id)
+            .execution_options(yield_per=100)
+        )
+        async for todo in result.scalars():
+            yield TodoResponse.model_validate(todo).model_dump_json() + "\n"
+
+
+# Must be declared before "/todos/{todo_id}/" so "export" isn't parsed as an id
+@router.get("/todos/export/", status_code=status.HTTP_200_OK)
+async def export_todos(user: user_dependency) -> StreamingResponse:
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
+    return StreamingResponse(
+        stream_todos(user["id"]), media_type="application/x-ndjson"
+    )
+
+
 @router.get(
     "/todos/{todo_id}/", status_code=status.HTTP_200_OK, response_model=TodoResponse
 )
 async def read_todo(
     user: user_dependency, db: db_dependency, todo_id: int = Path(gt=0)
-) -> TodoResponse:
+) -> Todos:
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
-    todo_model = (
-        db.query(Todos)
-        .filter(Todos.id == todo_id)
-        .filter(Todos.owner_id == user.get("id"))
-        .first()
+    result = await db.execute(
+        select(Todos).where(Todos.id == todo_id).where(Todos.owner_id == user.get("id"))
     )
+    todo_model = result.scalar_one_or_none()
     if not todo_model:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
@@ -80,19 +131,32 @@ async def create_todo(
         )
     todo_request_dict = todo_request.model_dump()
     tag_ids = todo_request_dict.pop("tags", [])
-    tag_objs = db.query(Tags).filter(Tags.id.in_(tag_ids)).all()
+    result = await db.execute(select(Tags).where(Tags.id.in_(tag_ids)))
+    tag_objs = list(result.scalars().all())
     todo_model = Todos(**todo_request_dict, owner_id=user.get("id"), tags=tag_objs)
     db.add(todo_model)
-    db.commit()
+    await db.commit()
 
 
 @router.get("/", status_code=status.HTTP_200_OK, response_model=List[TodoResponse])
-async def read_all(user: user_dependency, db: db_dependency) -> List[Todos]:
+async def read_all(
+    user: user_dependency,
+    db: db_dependency,
+    limit: int = Query(100, ge=1, le=500, description="Limit number of results"),
+    offset: int = Query(0, ge=0, description="Offset for results"),
+) -> Response:
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
-    return db.query(Todos).filter(Todos.owner_id == user.get("id")).all()
+    result = await db.execute(
+        select(Todos)
+        .where(Todos.owner_id == user.get("id"))
+        .order_by(Todos.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    return todo_list_response(result.scalars().all())
 
 
 @router.get(
@@ -104,27 +168,41 @@ async def read_todos(
     complete: bool = Query(None, description="Filter by completion status"),
     priority: int = Query(None, gt=0, lt=6, description="Filter by priority"),
     search: str = Query(
-        None, min_length=1, description="Search in title and description"
+        None, min_length=3, description="Search in title and description"
     ),
     limit: int = Query(10, ge=1, le=100, description="Limit number of results"),
     offset: int = Query(0, ge=0, description="Offset for results"),
-) -> List[Todos]:
+) -> Response:
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
 
-    query = db.query(Todos).filter(Todos.owner_id == user.get("id"))
+    query = select(Todos).where(Todos.owner_id == user.get("id"))
 
     if complete is not None:
-        query = query.filter(Todos.complete == complete)
+        query = query.where(Todos.complete == complete)
     if priority is not None:
-        query = query.filter(Todos.priority == priority)
+        query = query.where(Todos.priority == priority)
     if search:
-        query = query.filter(
-            (Todos.title.contains(search)) | (Todos.description.contains(search))
+        # ILIKE can use the pg_trgm indexes on title and description
+        query = query.where(
+            (Todos.title.icontains(search)) | (Todos.description.icontains(search))
         )
-    return query.offset(offset).limit(limit).all()
+    result = await db.execute(query.offset(offset).limit(limit))
+    return todo_list_response(result.scalars().all())
+
+
+async def copy_todos(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Loads rows with Postgres COPY through the session's asyncpg connection."""
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    asyncpg_connection: Any = raw_connection.driver_connection
+    await asyncpg_connection.copy_records_to_table(
+        Todos.__tablename__,
+        records=[tuple(row[column] for column in BULK_COPY_COLUMNS) for row in rows],
+        columns=BULK_COPY_COLUMNS,
+    )
 
 
 @router.post("/todos/bulk/create/", status_code=status.HTTP_201_CREATED)
@@ -136,38 +214,72 @@ async def create_todos_bulk(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
 
-    todo_models = [
-        Todos(**todo_request.model_dump(), owner_id=user.get("id"))
+    rows = [
+        todo_request.model_dump(exclude={"tags"}) | {"owner_id": user.get("id")}
         for todo_request in todo_requests
     ]
-    db.bulk_save_objects(todo_models)
-    db.commit()
+
+    # COPY can't return the new ids, so only use it when there are no tags to link
+    has_tags = any(todo_request.tags for todo_request in todo_requests)
+    is_asyncpg = db.get_bind().dialect.driver == "asyncpg"
+    if is_asyncpg and not has_tags and len(rows) >= BULK_COPY_THRESHOLD:
+        await copy_todos(db, rows)
+        await db.commit()
+        return
+
+    # Only attach tags that exist, same as create_todo
+    tag_ids = {tag_id for todo_request in todo_requests for tag_id in todo_request.tags}
+    existing_tag_ids: set[int] = set()
+    if tag_ids:
+        result = await db.execute(select(Tags.id).where(Tags.id.in_(tag_ids)))
+        existing_tag_ids = set(result.scalars().all())
+
+    for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+        batch = todo_requests[start : start + BULK_INSERT_BATCH_SIZE]
+        result = await db.execute(
+            insert(Todos).returning(Todos.id, sort_by_parameter_order=True),
+            rows[start : start + BULK_INSERT_BATCH_SIZE],
+        )
+        # RETURNING ids come back in the same order as the batch
+        tag_rows = [
+            {"todo_id": todo_id, "tag_id": tag_id}
+            for todo_id, todo_request in zip(result.scalars().all(), batch)
+            for tag_id in set(todo_request.tags) & existing_tag_ids
+        ]
+        if tag_rows:
+            await db.execute(insert(todo_tags), tag_rows)
+        await db.commit()
 
 
 @router.delete("/todos/bulk/delete/", status_code=status.HTTP_200_OK)
 async def delete_todos_bulk(
-    db: db_dependency, todo_ids: List[int] = Query()
+    user: user_dependency, db: db_dependency, todo_ids: List[int] = Query()
 ) -> Dict[str, str]:
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
+        )
     if not todo_ids:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No IDs provided"
         )
 
-    # remove duplicates and id's that don't exist
-    no_duplicates = set(todo_ids)
-    existing_tuples = db.query(Todos.id).filter(Todos.id.in_(no_duplicates)).all()
-    existing_ids = {id_tuple[0] for id_tuple in existing_tuples}
-    valid_ids = no_duplicates & existing_ids
+    # Ids that don't exist or belong to someone else are simply not returned
+    result = await db.execute(
+        delete(Todos)
+        .where(Todos.id.in_(set(todo_ids)))
+        .where(Todos.owner_id == user.get("id"))
+        .returning(Todos.id)
+    )
+    deleted_ids = result.scalars().all()
 
-    if not valid_ids:
+    if not deleted_ids:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="No valid IDs found"
         )
+    await db.commit()
 
-    db.query(Todos).filter(Todos.id.in_(valid_ids)).delete(synchronize_session=False)
-    db.commit()
-
-    return {"message": f"Deleted {len(valid_ids)} todos"}
+    return {"message": f"Deleted {len(deleted_ids)} todos"}
 
 
 @router.put("/todos/{todo_id}/", status_code=status.HTTP_204_NO_CONTENT)
@@ -182,22 +294,19 @@ async def update_todo(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
 
-    todo_model = (
-        db.query(Todos)
-        .filter(Todos.id == todo_id)
-        .filter(Todos.owner_id == user.get("id"))
-        .first()
+    # Ownership check and update in one statement; no row back means not found
+    result = await db.execute(
+        update(Todos)
+        .where(Todos.id == todo_id)
+        .where(Todos.owner_id == user.get("id"))
+        .values(**todo_request.model_dump(exclude={"tags"}))
+        .returning(Todos.id)
     )
-    if not todo_model:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
         )
-
-    todo_model.title = todo_request.title
-    todo_model.description = todo_request.description
-    todo_model.priority = todo_request.priority
-    todo_model.complete = todo_request.complete
-    db.commit()
+    await db.commit()
 
 
 @router.delete("/todos/{todo_id}/", status_code=status.HTTP_204_NO_CONTENT)
@@ -209,15 +318,14 @@ async def delete_todo(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication failed"
         )
 
-    todo_model = (
-        db.query(Todos)
-        .filter(Todos.id == todo_id)
-        .filter(Todos.owner_id == user.get("id"))
-        .first()
+    result = await db.execute(
+        delete(Todos)
+        .where(Todos.id == todo_id)
+        .where(Todos.owner_id == user.get("id"))
+        .returning(Todos.id)
     )
-    if not todo_model:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found"
         )
-    db.query(Todos).filter(Todos.id == todo_id).delete()
-    db.commit()
+    await db.commit()
@@ -1,19 +1,18 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from passlib.context import CryptContext
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models import Users
+from app.security import hash_password, verify_password
 from app.utils.auth_utils import get_current_user
 
 router = APIRouter(prefix="/user", tags=["user"])
 
-db_dependency = Annotated[Session, Depends(get_db)]
+db_dependency = Annotated[AsyncSession, Depends(get_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 class UserVerification(BaseModel):
@@ -41,18 +40,22 @@ async def change_password(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication Failed"
         )
 
-    user_model = db.query(Users).filter(Users.id == user.get("id")).first()
+    user_model = await db.get(Users, user.get("id"))
     if user_model is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    if not bcrypt_context.verify(
+    if not await verify_password(
         user_verification.password, user_model.hashed_password
     ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password"
         )
 
-    user_model.hashed_password = bcrypt_context.hash(user_verification.new_password)
-    db.commit()
+    # The stored hash already matches the new password
+    if user_verification.new_password == user_verification.password:
+        return
+
+    user_model.hashed_password = await hash_password(user_verification.new_password)
+    await db.commit()
@@ -0,0 +1,74 @@
+import asyncio
+import hmac
+
+import bcrypt
+from cachetools import TTLCache
+from passlib.context import CryptContext
+
+from app.config import get_settings
+
+settings = get_settings()
+# Encoded once and shared by the JWT and password-cache HMACs
+SECRET_KEY_BYTES = settings.SECRET_KEY.encode()
+
+# Passwords are hashed and checked with the native bcrypt package. Passlib is only
+# kept to verify hashes in other bcrypt variants ($2a$, $2y$) that predate this.
+NATIVE_BCRYPT_PREFIX = "$2b$"
+bcrypt_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+# Recent successful password checks, keyed by an HMAC of the stored hash and the
+# password so neither is kept in memory. Failures are never cached, so wrong
+# passwords always pay the full bcrypt cost. Changing the password changes the
+# hash and therefore the key. Only touched from the event loop, so no lock.
+_verify_cache: TTLCache[bytes, bool] = TTLCache(maxsize=4096, ttl=60)
+
+
+def _hash_password(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode(), salt).decode()
+
+
+def _verify_password(password: str, hashed_password: str) -> bool:
+    if hashed_password.startswith(NATIVE_BCRYPT_PREFIX):
+        return bcrypt.checkpw(password.encode(), hashed_password.encode())
+    if not hashed_password:
+        # Google OAuth users have no password to check against
+        return False
+    return bcrypt_context.verify(password, hashed_password)
+
+
+# bcrypt is slow on purpose and releases the GIL while it runs, so both calls are
+# run in worker threads to keep the event loop free and use multiple cores.
+async def hash_password(password: str) -> str:
+    return await asyncio.to_thread(_hash_password, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    """Check a password, skipping the KDF for credentials verified recently."""
+    key = hmac.new(
+        SECRET_KEY_BYTES,
+        hashed_password.encode() + b"\0" + password.encode(),
+        "sha256",
+    ).digest()
+    if key in _verify_cache:
+        return True
+
+    if not await asyncio.to_thread(_verify_password, password, hashed_password):
+        return False
+    _verify_cache[key] = True
+    return True
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash should be replaced on next login.
+
+    True for non-native bcrypt variants and for hashes made with a cost other
+    than BCRYPT_ROUNDS ("$2b$12$..." stores the cost in characters 4-5).
+    """
+    if not hashed_password:
+        return False
+    if not hashed_password.startswith(NATIVE_BCRYPT_PREFIX):
+        return True
+    return hashed_password[4:6] != f"{settings.BCRYPT_ROUNDS:02d}"
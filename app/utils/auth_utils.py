@@ -1,67 +1,175 @@
-from datetime import datetime, timedelta
+import hashlib
+import time
+from datetime import timedelta
 from typing import Any
 
-from fastapi import Depends, HTTPException
+import httpx
+import jwt
+from cachetools import TLRUCache
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from app.config import get_settings
-from app.database import Session
+from app.jwt_fast import verify_hs256
 from app.models import Users
+from app.security import (
+    SECRET_KEY_BYTES,
+    hash_password,
+    needs_rehash,
+    verify_password,
+)
 
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth_bearer = OAuth2PasswordBearer(tokenUrl="auth/token/")
 settings = get_settings()
+_JWT_HEADERS = {"alg": "HS256", "typ": "JWT"}
+ACCESS_TOKEN_EXPIRES = timedelta(minutes=30)
+REFRESH_TOKEN_TTL_SECONDS = int(timedelta(days=7).total_seconds())
 
 GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
-GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+# Google rotates signing keys with plenty of overlap, so an hour is safe
+GOOGLE_JWKS_TTL_SECONDS = 3600
 
+_google_jwks_cache: dict[str, Any] = {"jwk_set": None, "expires_at": 0.0}
 
-def authenticate_user(username: str, password: str, db: Session) -> Users | None:
-    user = db.query(Users).filter(Users.username == username).first()
+# Decoded payloads of our own tokens, keyed by a digest of the token. SPAs send
+# the same bearer token on every request, so most requests skip the HMAC check.
+JWT_CACHE_TTL_SECONDS = 30
+
+
+def _jwt_cache_expiry(_key: bytes, payload: dict[str, Any], now: float) -> float:
+    # Never keep a payload past the token's own expiry
+    exp: float = payload.get("exp", now)
+    return min(now + JWT_CACHE_TTL_SECONDS, exp)
+
+
+_jwt_cache: TLRUCache[bytes, dict[str, Any]] = TLRUCache(
+    maxsize=8192, ttu=_jwt_cache_expiry, timer=time.time
+)
+
+
+async def authenticate_user(
+    username: str, password: str, db: AsyncSession
+) -> Users | None:
+    result = await db.execute(select(Users).where(Users.username == username))
+    user = result.scalar_one_or_none()
     if not user:
         return None
-    if not bcrypt_context.verify(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return None
+    # Migrate hashes from other bcrypt variants now that we have the plaintext
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password(password)
+        await db.commit()
     return user
 
 
+async def get_google_jwks(client: httpx.AsyncClient) -> jwt.PyJWKSet:
+    """Return Google's public signing keys, fetching them at most once per TTL."""
+    if time.monotonic() < _google_jwks_cache["expires_at"]:
+        cached_jwk_set: jwt.PyJWKSet = _google_jwks_cache["jwk_set"]
+        return cached_jwk_set
+
+    response = await client.get(GOOGLE_CERTS_URL)
+    if response.status_code != status.HTTP_200_OK:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Failed to obtain signing keys from Google.",
+        )
+    # Parsed once per fetch so each login doesn't rebuild the RSA key objects
+    jwk_set = jwt.PyJWKSet.from_dict(response.json())
+    _google_jwks_cache["jwk_set"] = jwk_set
+    _google_jwks_cache["expires_at"] = time.monotonic() + GOOGLE_JWKS_TTL_SECONDS
+    return jwk_set
+
+
+async def verify_google_id_token(
+    client: httpx.AsyncClient, id_token: str
+) -> dict[str, Any]:
+    """Verify the id_token from Google's token endpoint and return its claims.
+
+    The signed claims already include the email and name, so this replaces a
+    round trip to the userinfo endpoint.
+    """
+    jwk_set = await get_google_jwks(client)
+    try:
+        signing_key = jwk_set[jwt.get_unverified_header(id_token)["kid"]]
+        claims: dict[str, Any] = jwt.decode(
+            id_token,
+            key=signing_key.key,
+            algorithms=["RS256"],
+            audience=settings.GOOGLE_CLIENT_ID,
+            issuer=GOOGLE_ISSUERS,
+        )
+    except (jwt.InvalidTokenError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Failed to verify ID token from Google.",
+        )
+    return claims
+
+
 def create_access_token(
     username: str, user_id: int, role: str, expires_delta: timedelta
 ) -> str:
-    headers = {"alg": "HS256", "typ": "JWT"}
     body = {
         "sub": username,
         "id": user_id,
         "role": role,
         "token_type": "access",
-        "exp": datetime.now() + expires_delta,
+        "exp": int(time.time()) + int(expires_delta.total_seconds()),
     }
-    return jwt.encode(claims=body, key=settings.SECRET_KEY, headers=headers)
+    return jwt.encode(body, key=SECRET_KEY_BYTES, headers=_JWT_HEADERS)
 
 
 def create_refresh_token(username: str, user_id: int) -> str:
-    headers = {"alg": "HS256", "typ": "JWT"}
     body = {
         "sub": username,
         "id": user_id,
         "token_type": "refresh",
-        "exp": datetime.now() + timedelta(days=7),
+        "exp": int(time.time()) + REFRESH_TOKEN_TTL_SECONDS,
+    }
+    return jwt.encode(body, key=SECRET_KEY_BYTES, headers=_JWT_HEADERS)
+
+
+def create_token_pair(user: Users) -> dict[str, str]:
+    """Issue the access/refresh token pair returned by every sign-in flow."""
+    return {
+        "access_token": create_access_token(
+            username=user.username,
+            user_id=user.id,
+            role=user.role,
+            expires_delta=ACCESS_TOKEN_EXPIRES,
+        ),
+        "refresh_token": create_refresh_token(username=user.username, user_id=user.id),
+        "token_type": "bearer",
     }
-    return jwt.encode(claims=body, key=settings.SECRET_KEY, headers=headers)
+
+
+def decode_token(token: str) -> dict[str, Any]:
+    """Verify one of our HS256 tokens, reusing the result for repeat presentations.
+
+    Raises jwt.InvalidTokenError.
+    """
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached_payload: dict[str, Any] | None = _jwt_cache.get(cache_key)
+    if cached_payload is not None:
+        return cached_payload
+
+    payload = verify_hs256(token)
+    _jwt_cache[cache_key] = payload
+    return payload
 
 
 def verify_refresh_token(token: str) -> dict[str, Any]:
     """Verify the refresh token and return the payload if valid."""
     try:
-        payload = jwt.decode(
-            token=token,
-            key=settings.SECRET_KEY,
-            algorithms=["HS256"],
-        )
+        payload = decode_token(token)
         if payload.get("token_type") != "refresh":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -76,7 +184,7 @@ def verify_refresh_token(token: str) -> dict[str, Any]:
                 detail="Could not validate credentials.",
             )
         return {"username": username, "id": user_id}
-    except JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate refresh token.",
@@ -84,14 +192,16 @@ def verify_refresh_token(token: str) -> dict[str, Any]:
 
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth_bearer),
 ) -> dict[str, Any]:
+    # FastAPI only caches a dependency per (callable, security scopes) pair within
+    # a request; request.state shares the decoded token across all of them.
+    cached_user: dict[str, Any] | None = getattr(request.state, "user", None)
+    if cached_user is not None:
+        return cached_user
     try:
-        payload = jwt.decode(
-            token=token,
-            key=settings.SECRET_KEY,
-            algorithms=["HS256"],
-        )
+        payload = decode_token(token)
         username: str | None = payload.get("sub")
         user_id: int | None = payload.get("id")
         user_role: str | None = payload.get("role")
@@ -100,8 +210,14 @@ async def get_current_user(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials.",
             )
-        return {"username": username, "id": user_id, "user_role": user_role}
-    except JWTError:
+        current_user: dict[str, Any] = {
+            "username": username,
+            "id": user_id,
+            "user_role": user_role,
+        }
+        request.state.user = current_user
+        return current_user
+    except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user."
         )
@@ -1,15 +1,41 @@
-from typing import Any
+from typing import Any, Sequence
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from strawberry.dataloader import DataLoader
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
+from app.models import Users
 
 
-def get_context(db: Session = Depends(get_db)) -> dict[str, Any]:
+async def load_users(ids: Sequence[int]) -> list[Users | None]:
+    """Batch load function for the users DataLoader.
+
+    Fetches every requested user in one query and returns them in the order of
+    ids, with None for ids that don't exist. The batch runs alongside other
+    resolvers, so it uses its own session.
+    """
+    async with SessionLocal() as db:
+        result = await db.execute(select(Users).where(Users.id.in_(ids)))
+        users_by_id = {user.id: user for user in result.scalars()}
+    return [users_by_id.get(user_id) for user_id in ids]
+
+
+def get_context(db: AsyncSession = Depends(get_db)) -> dict[str, Any]:
     """Returns a context dictionary for GraphQL resolvers.
 
-    This function is used to provide the database session to the resolvers.
+    This function is used to provide the database session to the resolvers,
+    along with per-request DataLoaders that batch lookups made by nested fields.
     It can be extended in the future to include other context values as needed.
+
+    Strawberry resolves sibling query fields concurrently and an AsyncSession
+    can't run two statements at once, so query resolvers open their own session
+    from session_factory. Mutations run one at a time and share db.
     """
-    return {"db": db}
+    return {
+        "db": db,
+        "session_factory": SessionLocal,
+        "users_loader": DataLoader(load_fn=load_users),
+        "missing_users": set(),
+    }
@@ -1,60 +1,115 @@
 from typing import List, Optional
 
 import strawberry
-from sqlalchemy.orm import Session
+from sqlalchemy import func, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Todos, Users
 
-from .types import TodoType, UserType
+from .types import TODO_COLUMNS, USER_COLUMNS, TodoType, UserType
+
+# Rows fetched per round trip when streaming list queries
+LIST_YIELD_PER = 500
+# Upper bound on the page size list queries accept
+MAX_PAGE_SIZE = 500
+
+
+def check_page(limit: int, offset: int) -> None:
+    """Rejects page arguments outside the range the list queries serve."""
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    if offset < 0:
+        raise ValueError("offset must not be negative")
 
 
 @strawberry.type
 class Query:
     @strawberry.field
-    def todos(
+    async def todos(
         self,
         info: strawberry.Info,
         complete: Optional[bool] = None,
         owner_id: Optional[int] = None,
+        limit: int = 50,
+        offset: int = 0,
     ) -> List[TodoType]:
-        db: Session = info.context["db"]
-        query = db.query(Todos)
+        check_page(limit, offset)
+        # A lambda statement is built and cache-keyed once per filter shape;
+        # later calls only extract the new parameter values.
+        query = lambda_stmt(lambda: select(*TODO_COLUMNS))
 
         if complete is not None:
-            query = query.filter(Todos.complete == complete)
+            query += lambda s: s.where(Todos.complete == complete)
 
         if owner_id is not None:
-            query = query.filter(Todos.owner_id == owner_id)
+            query += lambda s: s.where(Todos.owner_id == owner_id)
 
-        return [TodoType.from_orm(todo) for todo in query.all()]
+        query += lambda s: s.order_by(Todos.id).limit(limit).offset(offset)
+
+        async with info.context["session_factory"]() as db:
+            result = await db.stream(
+                query, execution_options={"yield_per": LIST_YIELD_PER}
+            )
+            return [TodoType.from_row(row) async for row in result.mappings()]
 
     @strawberry.field
-    def todo(
+    async def todos_count(
+        self,
+        info: strawberry.Info,
+        complete: Optional[bool] = None,
+        owner_id: Optional[int] = None,
+    ) -> int:
+        """Total number of todos matching the todos filters, for paging."""
+        query = select(func.count()).select_from(Todos)
+
+        if complete is not None:
+            query = query.where(Todos.complete == complete)
+
+        if owner_id is not None:
+            query = query.where(Todos.owner_id == owner_id)
+
+        async with info.context["session_factory"]() as db:
+            count: int = await db.scalar(query) or 0
+        return count
+
+    @strawberry.field
+    async def todo(
         self,
         info: strawberry.Info,
         id: int,
     ) -> Optional[TodoType]:
-        db: Session = info.context["db"]
-        todo = db.query(Todos).filter(Todos.id == id).first()
+        async with info.context["session_factory"]() as db:
+            todo = await db.get(Todos, id)
         return TodoType.from_orm(todo) if todo else None
 
     @strawberry.field
-    def users(self, info: strawberry.Info) -> List[UserType]:
-        db: Session = info.context["db"]
-        query = db.query(Users)
-        return [UserType.from_orm(user) for user in query.all()]
+    async def users(
+        self, info: strawberry.Info, limit: int = 50, offset: int = 0
+    ) -> List[UserType]:
+        check_page(limit, offset)
+        query = select(*USER_COLUMNS).order_by(Users.id).limit(limit).offset(offset)
+        async with info.context["session_factory"]() as db:
+            result = await db.stream(query.execution_options(yield_per=LIST_YIELD_PER))
+            return [UserType.from_row(row) async for row in result.mappings()]
+
+    @strawberry.field
+    async def users_count(self, info: strawberry.Info) -> int:
+        """Total number of users, for paging."""
+        async with info.context["session_factory"]() as db:
+            count: int = await db.scalar(select(func.count()).select_from(Users)) or 0
+        return count
 
     @strawberry.field
-    def user(self, info: strawberry.Info, id: int) -> Optional[UserType]:
-        db: Session = info.context["db"]
-        user = db.query(Users).filter(Users.id == id).first()
+    async def user(self, info: strawberry.Info, id: int) -> Optional[UserType]:
+        async with info.context["session_factory"]() as db:
+            user = await db.get(Users, id)
         return UserType.from_orm(user) if user else None
 
 
 @strawberry.type
 class Mutation:
     @strawberry.field
-    def create_todo(
+    async def create_todo(
         self,
         info: strawberry.Info,
         title: str,
@@ -62,7 +117,7 @@ class Mutation:
         priority: int,
         owner_id: Optional[int] = None,
     ) -> TodoType:
-        db: Session = info.context["db"]
+        db: AsyncSession = info.context["db"]
         new_todo = Todos(
             title=title,
             description=description,
@@ -71,6 +126,6 @@ class Mutation:
             owner_id=owner_id,
         )
         db.add(new_todo)
-        db.commit()
-        db.refresh(new_todo)
+        await db.commit()
+        await db.refresh(new_todo)
         return TodoType.from_orm(new_todo)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Mapping, Optional
 
 import strawberry
 
@@ -7,9 +7,35 @@ from app.models import Todos, Users
 # Types are used to define the shape of data in GraphQL
 # that is returned to the client.
 
-
+# Columns list queries select for each type, so rows can be read without
+# building full ORM instances. The labels must match the type's field names.
+TODO_COLUMNS = (
+    Todos.id,
+    Todos.title,
+    Todos.description,
+    Todos.priority,
+    Todos.complete,
+    Todos.owner_id,
+)
+USER_COLUMNS = (
+    Users.id,
+    Users.email,
+    Users.username,
+    Users.first_name,
+    Users.last_name,
+    Users.is_active,
+    Users.role,
+)
+
+
+# List queries build thousands of these, so both types use __slots__ to drop the
+# per-instance __dict__. strawberry.type has no slots option, and wrapping
+# a slotted dataclass breaks on the resolver fields, so the slots are declared
+# directly. Dataclasses treat the slot descriptors as fields without defaults.
 @strawberry.type
 class TodoType:
+    __slots__ = ("id", "title", "description", "priority", "complete", "owner_id")
+
     id: int
     title: str
     description: str
@@ -18,12 +44,19 @@ class TodoType:
     owner_id: Optional[int]
 
     @strawberry.field
-    def owner(self, info: strawberry.Info) -> Optional["UserType"]:
-        db = info.context["db"]
-        if not self.owner_id:
+    async def owner(self, info: strawberry.Info) -> Optional["UserType"]:
+        if self.owner_id is None:
+            return None
+        # Owner ids already known to be dangling skip the loader entirely
+        missing_users: set[int] = info.context["missing_users"]
+        if self.owner_id in missing_users:
             return None
-        user = db.query(Users).filter(Users.id == self.owner_id).first()
-        return UserType.from_orm(user) if user else None
+        # Owners of every todo in the response are fetched in one batched query
+        user = await info.context["users_loader"].load(self.owner_id)
+        if user is None:
+            missing_users.add(self.owner_id)
+            return None
+        return UserType.from_orm(user)
 
     @classmethod
     def from_orm(cls, todo: Todos) -> "TodoType":
@@ -40,9 +73,24 @@ class TodoType:
             owner_id=todo.owner_id,
         )
 
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "TodoType":
+        """Builds a TodoType from a row mapping selected with TODO_COLUMNS."""
+        return cls(**row)
+
 
 @strawberry.type
 class UserType:
+    __slots__ = (
+        "id",
+        "email",
+        "username",
+        "first_name",
+        "last_name",
+        "is_active",
+        "role",
+    )
+
     id: int
     email: str
     username: str
@@ -63,6 +111,11 @@ class UserType:
             role=user.role,
         )
 
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "UserType":
+        """Builds a UserType from a row mapping selected with USER_COLUMNS."""
+        return cls(**row)
+
 
 # Inputs are used to define the shape of data that is accepted by the GraphQL API
 # from the client.
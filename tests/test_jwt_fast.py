@@ -0,0 +1,128 @@
+import base64
+import hmac
+import json
+import time
+from typing import Any
+
+import jwt
+import pytest
+
+from app.jwt_fast import verify_hs256
+from app.security import SECRET_KEY_BYTES
+
+
+def b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def make_token(payload: Any, header: Any = None, key: bytes = SECRET_KEY_BYTES) -> str:
+    """Builds an HS256-signed token by hand so any header or payload can be sent."""
+    if header is None:
+        header = {"alg": "HS256", "typ": "JWT"}
+    signing_input = (
+        b64encode(json.dumps(header).encode())
+        + "."
+        + b64encode(json.dumps(payload).encode())
+    )
+    signature = hmac.new(key, signing_input.encode(), "sha256").digest()
+    return signing_input + "." + b64encode(signature)
+
+
+def valid_payload() -> dict[str, Any]:
+    return {"sub": "alice", "id": 1, "token_type": "access", "exp": time.time() + 60}
+
+
+def test_valid_token_returns_payload() -> None:
+    payload = valid_payload()
+    assert verify_hs256(make_token(payload)) == payload
+
+
+def test_accepts_tokens_issued_by_pyjwt() -> None:
+    payload = valid_payload()
+    payload["exp"] = int(payload["exp"])
+    token = jwt.encode(payload, key=SECRET_KEY_BYTES, algorithm="HS256")
+    assert verify_hs256(token) == payload
+
+
+def test_tampered_signature_is_rejected() -> None:
+    token = make_token(valid_payload())
+    signing_input, signature = token.rsplit(".", 1)
+    first = "A" if signature[0] != "A" else "B"
+    tampered = f"{signing_input}.{first}{signature[1:]}"
+    with pytest.raises(jwt.InvalidSignatureError):
+        verify_hs256(tampered)
+
+
+def test_tampered_payload_is_rejected() -> None:
+    header, _, signature = make_token(valid_payload()).split(".")
+    forged = valid_payload() | {"id": 2, "role": "admin"}
+    payload = b64encode(json.dumps(forged).encode())
+    with pytest.raises(jwt.InvalidSignatureError):
+        verify_hs256(f"{header}.{payload}.{signature}")
+
+
+def test_wrong_key_is_rejected() -> None:
+    token = make_token(valid_payload(), key=SECRET_KEY_BYTES + b"other")
+    with pytest.raises(jwt.InvalidSignatureError):
+        verify_hs256(token)
+
+
+@pytest.mark.parametrize("alg", ["none", "HS512", None])
+def test_other_algorithms_are_rejected(alg: str | None) -> None:
+    token = make_token(valid_payload(), header={"alg": alg, "typ": "JWT"})
+    with pytest.raises(jwt.DecodeError):
+        verify_hs256(token)
+
+
+def test_unsigned_token_is_rejected() -> None:
+    header = b64encode(json.dumps({"alg": "none", "typ": "JWT"}).encode())
+    payload = b64encode(json.dumps(valid_payload()).encode())
+    with pytest.raises(jwt.DecodeError):
+        verify_hs256(f"{header}.{payload}.")
+
+
+def test_expired_token_is_rejected() -> None:
+    token = make_token(valid_payload() | {"exp": time.time() - 1})
+    with pytest.raises(jwt.ExpiredSignatureError):
+        verify_hs256(token)
+
+
+@pytest.mark.parametrize("exp", [True, False, "9999999999", None])
+def test_invalid_exp_is_rejected(exp: Any) -> None:
+    token = make_token(valid_payload() | {"exp": exp})
+    with pytest.raises(jwt.DecodeError):
+        verify_hs256(token)
+
+
+def test_missing_exp_is_rejected() -> None:
+    payload = valid_payload()
+    del payload["exp"]
+    with pytest.raises(jwt.DecodeError):
+        verify_hs256(make_token(payload))
+
+
+@pytest.mark.parametrize(
+    "token",
+    ["", "abc", "abc.def", "abc.def.ghi.jkl", "e30.e30.e30.e30"],
+)
+def test_wrong_segment_count_is_rejected(token: str) -> None:
+    with pytest.raises(jwt.DecodeError):
+        verify_hs256(token)
+
+
+@pytest.mark.parametrize("payload", [[1, 2, 3], "alice", 42, None])
+def test_non_dict_payload_is_rejected(payload: Any) -> None:
+    with pytest.raises(jwt.DecodeError):
+        verify_hs256(make_token(payload))
+
+
+@pytest.mark.parametrize("header", [[], "HS256"])
+def test_non_dict_header_is_rejected(header: Any) -> None:
+    with pytest.raises(jwt.DecodeError):
+        verify_hs256(make_token(valid_payload(), header=header))
+
+
+def test_malformed_encoding_is_rejected() -> None:
+    _, payload, signature = make_token(valid_payload()).split(".")
+    with pytest.raises(jwt.DecodeError):
+        verify_hs256(f"!!!.{payload}.{signature}")